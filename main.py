@@ -20,19 +20,26 @@ Description:
 Dependencies:
     - tkinter, ttk, messagebox for the GUI.
     - matplotlib for plotting.
-    - pandas for data handling.
+    - pandas and numpy for data handling.
     - review_fetcher.py and review_analyzer.py for data loading and NLP tasks.
     
 Usage:
     Run this file directly to launch the GUI application.
 """
 
+from itertools import islice
 import tkinter as tk
 from tkinter import ttk, messagebox
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd 
 from review_fetcher import fetch_reviews
-from review_analyzer import analyze_sentiment, analyze_sentiment_advanced, perform_topic_modeling
+from review_analyzer import (analyze_sentiment, analyze_sentiment_series, analyze_sentiment_advanced,
+                             analyze_sentiment_advanced_batch, perform_topic_modeling, SENTIMENT_LABELS)
+
+# Number of rows inserted into the review table at a time. Further rows are
+# added as the user scrolls towards the bottom of the table.
+TREE_PAGE_SIZE = 500
 
 class SentimentAnalyzerApp:
     """
@@ -46,6 +53,9 @@ class SentimentAnalyzerApp:
         self.master.geometry("900x850")
         self.data = None          # Holds all loaded reviews
         self.current_data = None  # Holds currently displayed (filtered/sorted) reviews
+        self._date_sorted_idx = None  # Sorted date values of self.data, used for range filtering
+        self._pending_rows = iter(())  # Table rows not yet inserted into the Treeview
+        self._rows_pending = 0  # Number of rows left in self._pending_rows
         self.create_widgets()
         
     def create_widgets(self):
@@ -111,7 +121,8 @@ class SentimentAnalyzerApp:
         
         # Treeview for Displaying Reviews
         columns = ("Date", "Review", "Sentiment", "Polarity")
-        self.tree = ttk.Treeview(self.master, columns=columns, show="headings", height=15)
+        self.tree = ttk.Treeview(self.master, columns=columns, show="headings", height=15,
+                                 yscrollcommand=self.on_tree_scroll)
         for col in columns:
             self.tree.heading(col, text=col)
             self.tree.column(col, width=200 if col=="Review" else 120)
@@ -164,24 +175,57 @@ class SentimentAnalyzerApp:
         if df is None or df.empty:
             messagebox.showerror("Error", "No reviews loaded!")
             return
+        # Sort by date once so date filters and date sorts can use the order directly.
+        df = df.sort_values('date', kind='stable').reset_index(drop=True)
+        # Format the dates for display once; filtered and sorted views carry this column along.
+        df['_date_str'] = df['date'].dt.strftime("%Y-%m-%d")
         self.data = df
-        self.current_data = df.copy()  # Initially, all data is shown.
+        self._date_sorted_idx = df['date'].values
+        self.current_data = df  # Initially, all data is shown.
         self.populate_tree(self.current_data)
         self.total_label.config(text=f"Total Reviews: {len(self.current_data)}")
     
     def populate_tree(self, df):
         """
         Populate the Treeview with review data.
-        Clears any existing entries and inserts rows from the DataFrame.
+        Clears any existing entries and inserts the first page of rows from the DataFrame;
+        the remaining rows are inserted as the user scrolls (see on_tree_scroll).
+        Each row's item id is its DataFrame index label, so rows can later be reordered in place.
+        """
+        self.tree.delete(*self.tree.get_children())
+        # Build each column once up front instead of boxing every row into a Series.
+        # Dates are already formatted in load_reviews() and polarities in analyze_reviews().
+        dates = df['_date_str'].to_numpy()
+        reviews = df['review'].to_numpy()
+        sentiments = df['Sentiment'].to_numpy() if 'Sentiment' in df else np.full(len(df), "")
+        polarities = df['_PolarityStr'].to_numpy() if '_PolarityStr' in df else np.full(len(df), "")
+        iids = df.index.astype(str)
+        self._pending_rows = zip(iids, zip(dates, reviews, sentiments, polarities))
+        self._rows_pending = len(df)
+        self.insert_tree_page()
+
+    def insert_tree_page(self):
+        """
+        Insert the next TREE_PAGE_SIZE pending rows into the Treeview.
+        Columns are hidden while inserting so the table is laid out once per page
+        instead of once per row.
+        """
+        rows = list(islice(self._pending_rows, TREE_PAGE_SIZE))
+        if not rows:
+            return
+        self._rows_pending -= len(rows)
+        self.tree.configure(displaycolumns=())
+        for iid, values in rows:
+            self.tree.insert("", tk.END, iid=iid, values=values)
+        self.tree.configure(displaycolumns="#all")
+
+    def on_tree_scroll(self, first, last):
+        """
+        Scroll callback for the Treeview.
+        Inserts the next page of rows once the user scrolls near the bottom of the table.
         """
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        # Insert rows
-        for idx, row in df.iterrows():
-            date_str = row['date'].strftime("%Y-%m-%d") if isinstance(row['date'], pd.Timestamp) else row['date']
-            sentiment = row.get('Sentiment', "")
-            polarity = f"{row.get('Polarity', 0):.2f}" if 'Polarity' in row else ""
-            self.tree.insert("", tk.END, values=(date_str, row['review'], sentiment, polarity))
+        if float(last) >= 0.9:
+            self.insert_tree_page()
     
     def analyze_reviews(self):
         """
@@ -194,18 +238,25 @@ class SentimentAnalyzerApp:
             messagebox.showerror("Error", "Load reviews first!")
             return
         
-        sentiments = []
-        polarities = []
         # Use advanced NLP if toggle is checked
-        for index, row in self.current_data.iterrows():
-            if self.use_advanced.get():
-                sentiment, polarity = analyze_sentiment_advanced(row['review'])
-            else:
-                sentiment, polarity = analyze_sentiment(row['review'])
-            sentiments.append(sentiment)
-            polarities.append(polarity)
-        self.current_data['Sentiment'] = sentiments
-        self.current_data['Polarity'] = polarities
+        if self.use_advanced.get():
+            # Run the whole review column through the pipeline in batches.
+            results = analyze_sentiment_advanced_batch(self.current_data['review'].tolist())
+            labels = pd.Categorical([r['label'] for r in results])
+            polarities = [r['score'] for r in results]
+        else:
+            labels, polarities = analyze_sentiment_series(self.current_data['review'])
+            labels = pd.Categorical(labels, categories=SENTIMENT_LABELS)
+        # The polarity is formatted for display once here, rather than on every table refresh.
+        # This uses the full-precision scores, so rounding matches the original values.
+        polarities = np.asarray(polarities, dtype=np.float64)
+        polarity_strs = pd.Series(polarities).map("{:.2f}".format).astype("string[pyarrow]")
+        # Store labels as a category (one small integer code per review) and scores as float32.
+        polarities = polarities.astype(np.float32)
+        # current_data may be a slice of self.data, so the new columns are added on a copy
+        # made here rather than on every load/filter/sort.
+        self.current_data = self.current_data.assign(Sentiment=labels, Polarity=polarities,
+                                                     _PolarityStr=polarity_strs.array)
         self.populate_tree(self.current_data)
         messagebox.showinfo("Analysis Complete", "Reviews have been analyzed.")
     
@@ -216,8 +267,10 @@ class SentimentAnalyzerApp:
         """
         self.data = None
         self.current_data = None
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self._date_sorted_idx = None
+        self._pending_rows = iter(())
+        self._rows_pending = 0
+        self.tree.delete(*self.tree.get_children())
         self.total_label.config(text="Total Reviews: 0")
     
     def filter_reviews(self):
@@ -244,12 +297,15 @@ class SentimentAnalyzerApp:
             messagebox.showerror("Error", f"Invalid date format: {e}")
             return
         
-        # Filter the data based on the date range
-        filtered_data = self.data[(self.data['date'] >= start_date) & (self.data['date'] <= end_date)]
+        # Filter the data based on the date range. self.data is sorted by date,
+        # so the range can be located with a binary search and sliced directly.
+        lo = np.searchsorted(self._date_sorted_idx, np.datetime64(start_date), 'left')
+        hi = np.searchsorted(self._date_sorted_idx, np.datetime64(end_date), 'right')
+        filtered_data = self.data.iloc[lo:hi]
         if filtered_data.empty:
             messagebox.showinfo("Info", "No reviews found in this date range.")
         else:
-            self.current_data = filtered_data.copy()
+            self.current_data = filtered_data
             self.populate_tree(self.current_data)
             self.total_label.config(text=f"Total Reviews: {len(self.current_data)}")
     
@@ -263,19 +319,54 @@ class SentimentAnalyzerApp:
             messagebox.showerror("Error", "No data to sort!")
             return
         option = self.sort_option.get()
-        # Sort based on the chosen option
+        dates = self.current_data['date']
+        # Sort based on the chosen option. Data is usually already in date order
+        # (see load_reviews), in which case it only needs to be kept or reversed.
+        # Otherwise the row order is computed with NumPy and applied with iloc.
         if option == "Date Ascending":
-            sorted_data = self.current_data.sort_values(by='date', ascending=True)
+            if dates.is_monotonic_increasing:
+                sorted_data = self.current_data
+            elif dates.is_monotonic_decreasing:
+                sorted_data = self.current_data[::-1]
+            else:
+                order = np.argsort(dates.values.view('i8'), kind='stable')
+                sorted_data = self.current_data.iloc[order]
         elif option == "Date Descending":
-            sorted_data = self.current_data.sort_values(by='date', ascending=False)
-        elif option == "Sentiment Ascending":
-            sorted_data = self.current_data.sort_values(by='Sentiment', ascending=True)
-        elif option == "Sentiment Descending":
-            sorted_data = self.current_data.sort_values(by='Sentiment', ascending=False)
+            if dates.is_monotonic_decreasing:
+                sorted_data = self.current_data
+            elif dates.is_monotonic_increasing:
+                sorted_data = self.current_data[::-1]
+            else:
+                order = np.argsort(dates.values.view('i8'), kind='stable')[::-1]
+                sorted_data = self.current_data.iloc[order]
+        elif option in ("Sentiment Ascending", "Sentiment Descending"):
+            if 'Sentiment' not in self.current_data.columns:
+                messagebox.showerror("Error", "Please analyze reviews first!")
+                return
+            # Sentiment is stored as a category (see analyze_reviews), so sorting its
+            # integer codes gives the same order as sorting the labels.
+            order = np.argsort(self.current_data['Sentiment'].cat.codes.values, kind='stable')
+            if option == "Sentiment Descending":
+                order = order[::-1]
+            sorted_data = self.current_data.iloc[order]
         else:
             sorted_data = self.current_data
-        self.current_data = sorted_data.copy()
-        self.populate_tree(self.current_data)
+        if sorted_data is self.current_data:
+            return
+        self.current_data = sorted_data
+        if self._rows_pending == 0:
+            # Every row is already in the table, so only their order needs to change.
+            self.reorder_tree(self.current_data)
+        else:
+            self.populate_tree(self.current_data)
+
+    def reorder_tree(self, df):
+        """
+        Reorder the rows already in the Treeview to match the order of the DataFrame.
+        Rows are moved in place instead of being deleted and inserted again.
+        """
+        for position, iid in enumerate(df.index.astype(str)):
+            self.tree.move(iid, "", position)
     
     def show_sentiment_distribution(self):
         """
@@ -286,6 +377,8 @@ class SentimentAnalyzerApp:
             messagebox.showerror("Error", "Please analyze reviews first!")
             return
         counts = self.current_data['Sentiment'].value_counts()
+        # Sentiment is a category, so labels with no reviews are counted too; leave them off the chart.
+        counts = counts[counts > 0]
         counts.plot(kind="bar", color="skyblue", title="Sentiment Distribution")
         plt.xlabel("Sentiment")
         plt.ylabel("Count")
@@ -9,18 +9,228 @@
 # In addition, we provide a function to perform topic modeling using Non-negative Matrix Factorization (NMF)
 # on a collection of reviews. This can help extract common themes or topics from the text.
 #
-# Note: The advanced sentiment analysis pipeline may download model files the first time you run it.
+# Note: The advanced sentiment analysis pipeline is only loaded the first time advanced analysis is used,
+# and may download and export model files at that point.
 
-from textblob import TextBlob
-from transformers import pipeline
-from sklearn.feature_extraction.text import CountVectorizer
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import copy
+import functools
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+from diskcache import Cache
+from numba import njit
+from textblob.en.sentiments import PatternAnalyzer
+from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.decomposition import NMF
 
-# Load the advanced sentiment analysis pipeline from Hugging Face.
-# This pipeline is pre-trained to classify text sentiment and returns a label (e.g., "POSITIVE")
-# along with a confidence score.
-advanced_pipeline = pipeline("sentiment-analysis")
+# The Hugging Face model used for advanced sentiment analysis. It is pre-trained to classify text
+# sentiment and returns a label (e.g., "POSITIVE") along with a confidence score.
+ADVANCED_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+
+# Local folder holding the model exported to ONNX, so the export only happens once.
+# Each model gets its own subfolder, so changing ADVANCED_MODEL never loads an old export.
+ADVANCED_MODEL_DIR = os.path.join(os.path.expanduser("~/.sentiment_app_onnx"), ADVANCED_MODEL.replace("/", "--"))
+
+# The advanced pipeline is created on first use (see get_advanced_pipeline) so that
+# starting the application doesn't wait for the model to load.
+_advanced_pipeline = None
+
+# Reviews per chunk when advanced analysis is spread over worker threads.
+ADVANCED_CHUNK_SIZE = 64
+
+# Number of worker threads for advanced analysis, and the number of threads each ONNX Runtime
+# run on a worker may use, so that all workers together use about one thread per CPU core.
+# The main-thread pipeline keeps ONNX Runtime's default of using every core.
+ADVANCED_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+ADVANCED_INTRA_OP_THREADS = max(1, (os.cpu_count() or 1) // ADVANCED_WORKERS)
+
+# Model shared by the worker threads, loaded with the capped thread count (see _get_worker_model).
+_worker_model = None
+
+# Thread pool for advanced analysis, created on first use and kept for the whole session so
+# that each worker's pipeline (see _get_thread_pipeline) is built only once.
+_advanced_executor = None
+
+# Per-thread pipelines used by the worker threads (see _get_thread_pipeline).
+_thread_state = threading.local()
+
+# Advanced results saved on disk so they survive restarts of the application.
+# Entries are keyed by the model name and a hash of the review text. Like the pipeline,
+# the cache is only opened the first time advanced analysis is used (see get_advanced_cache).
+ADVANCED_CACHE_DIR = os.path.expanduser("~/.sentiment_app_cache")
+_advanced_cache = None
+
+# The analyzer TextBlob uses by default. Keeping one instance avoids building a new
+# TextBlob (and its analyzer) for every review.
+basic_analyzer = PatternAnalyzer()
+
+# Fitted topic models, keyed by the reviews and the number of topics, so showing
+# topics again for the same reviews doesn't refit the model. Reviews are keyed by how often
+# each text occurs, so the same reviews in another order (e.g. after sorting) hit the cache.
+_topic_model_cache = {}
+
+# Extracted topic lists, keyed by the reviews, the number of topics and the number of words.
+_topic_cache = {}
+
+# Number of entries kept in each topic cache; the oldest entries are dropped first.
+TOPIC_CACHE_SIZE = 4
+
+# A cached topic model is only reused as a starting point when its vocabulary was fitted on
+# all but at most this many of the new reviews. Otherwise the model is fitted from scratch.
+TOPIC_WARM_START_MAX_NEW = 5
 
+# Sentiment labels indexed by the codes returned from bin_polarity() (shifted by +1).
+SENTIMENT_LABELS = np.array(["Negative", "Neutral", "Positive"])
+
+@njit(cache=True)
+def bin_polarity(polarity):
+    """
+    Classify an array of polarity scores into sentiment codes.
+    
+    Compiled with Numba so the thresholds are applied in a tight native loop:
+      - Polarity > 0.1  -> 1  (Positive)
+      - Polarity < -0.1 -> -1 (Negative)
+      - Otherwise      -> 0  (Neutral)
+    
+    Parameters:
+        polarity (np.ndarray): A float64 array of polarity scores.
+    
+    Returns:
+        np.ndarray: An int8 array of sentiment codes.
+    """
+    out = np.empty(polarity.shape[0], np.int8)
+    for i in range(polarity.shape[0]):
+        value = polarity[i]
+        if value > 0.1:
+            out[i] = 1
+        elif value < -0.1:
+            out[i] = -1
+        else:
+            out[i] = 0
+    return out
+
+def get_advanced_pipeline():
+    """
+    Return the advanced sentiment analysis pipeline, loading it on the first call.
+    
+    The model is exported to ONNX and run with ONNX Runtime on the CPU, which is faster
+    than running the PyTorch model directly. The exported model is saved to ADVANCED_MODEL_DIR
+    the first time (see _export_advanced_model), and is always loaded from there.
+    
+    Returns:
+        Pipeline: A Hugging Face "sentiment-analysis" pipeline.
+    """
+    global _advanced_pipeline
+    if _advanced_pipeline is None:
+        # Imported here because loading these libraries is slow.
+        from transformers import AutoTokenizer, pipeline
+        model = _load_advanced_model()
+        tokenizer = AutoTokenizer.from_pretrained(ADVANCED_MODEL_DIR)
+        _advanced_pipeline = pipeline("sentiment-analysis", model=model, tokenizer=tokenizer)
+    return _advanced_pipeline
+
+def get_advanced_cache():
+    """
+    Return the disk cache of advanced results, opening it on the first call.
+    
+    Returns:
+        Cache: A diskcache Cache stored in ADVANCED_CACHE_DIR.
+    """
+    global _advanced_cache
+    if _advanced_cache is None:
+        _advanced_cache = Cache(ADVANCED_CACHE_DIR)
+    return _advanced_cache
+
+def _load_advanced_model(session_options=None):
+    """
+    Load the ONNX model from ADVANCED_MODEL_DIR, exporting it first if needed.
+    """
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    if not os.path.isdir(ADVANCED_MODEL_DIR):
+        _export_advanced_model()
+    return ORTModelForSequenceClassification.from_pretrained(
+        ADVANCED_MODEL_DIR, provider="CPUExecutionProvider", session_options=session_options
+    )
+
+def _get_worker_model():
+    """
+    Return the model used by the worker threads, loading it on the first call.
+    
+    Its ONNX Runtime session is limited to ADVANCED_INTRA_OP_THREADS threads per run, because
+    several workers run it at the same time.
+    """
+    global _worker_model
+    if _worker_model is None:
+        import onnxruntime
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = ADVANCED_INTRA_OP_THREADS
+        _worker_model = _load_advanced_model(session_options)
+    return _worker_model
+
+def _export_advanced_model():
+    """
+    Export ADVANCED_MODEL to ONNX and save it, with its tokenizer, to ADVANCED_MODEL_DIR.
+    
+    The files are written to a temporary folder that is renamed into place only once saving
+    has finished, so an interrupted export never leaves a half-written ADVANCED_MODEL_DIR.
+    """
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    from transformers import AutoTokenizer
+    parent_dir = os.path.dirname(ADVANCED_MODEL_DIR)
+    os.makedirs(parent_dir, exist_ok=True)
+    temp_dir = tempfile.mkdtemp(prefix=".export-", dir=parent_dir)
+    try:
+        model = ORTModelForSequenceClassification.from_pretrained(
+            ADVANCED_MODEL, export=True, provider="CPUExecutionProvider"
+        )
+        model.save_pretrained(temp_dir)
+        AutoTokenizer.from_pretrained(ADVANCED_MODEL).save_pretrained(temp_dir)
+        try:
+            os.rename(temp_dir, ADVANCED_MODEL_DIR)
+        except OSError:
+            # Another session finished its export first; keep that one.
+            if not os.path.isdir(ADVANCED_MODEL_DIR):
+                raise
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def _get_thread_pipeline():
+    """
+    Return a pipeline for the current worker thread.
+    
+    All threads share the worker model, but each gets its own copy of the tokenizer, because a
+    fast tokenizer cannot be used with truncation from several threads at the same time.
+    """
+    thread_pipeline = getattr(_thread_state, "pipeline", None)
+    if thread_pipeline is None:
+        from transformers import pipeline
+        thread_pipeline = pipeline("sentiment-analysis", model=_get_worker_model(),
+                                   tokenizer=copy.deepcopy(get_advanced_pipeline().tokenizer))
+        _thread_state.pipeline = thread_pipeline
+    return thread_pipeline
+
+def _get_advanced_executor():
+    """
+    Return the thread pool used for advanced analysis, creating it on the first call.
+    """
+    global _advanced_executor
+    if _advanced_executor is None:
+        _advanced_executor = ThreadPoolExecutor(max_workers=ADVANCED_WORKERS)
+    return _advanced_executor
+
+def _run_advanced_chunk(chunk, batch_size):
+    """
+    Run one chunk of reviews through the current thread's pipeline.
+    """
+    return _get_thread_pipeline()(chunk, batch_size=batch_size, truncation=True)
+
+@functools.lru_cache(maxsize=10000)
 def analyze_sentiment(text):
     """
     Perform basic sentiment analysis using TextBlob.
@@ -31,16 +241,16 @@ def analyze_sentiment(text):
       - Polarity < -0.1 -> "Negative"
       - Otherwise      -> "Neutral"
     
+    Results are cached by review text, so repeated reviews are only analyzed once.
+    
     Parameters:
         text (str): The text of the review to analyze.
     
     Returns:
         tuple: A tuple containing the sentiment label and the polarity score.
     """
-    # Create a TextBlob object from the text.
-    blob = TextBlob(text)
-    # Get the sentiment polarity (range: -1.0 to 1.0)
-    polarity = blob.sentiment.polarity
+    # Get the sentiment polarity (range: -1.0 to 1.0) from the shared analyzer.
+    polarity = basic_analyzer.analyze(text).polarity
     # Determine the sentiment label based on thresholds.
     if polarity > 0.1:
         label = "Positive"
@@ -50,13 +260,30 @@ def analyze_sentiment(text):
         label = "Neutral"
     return label, polarity
 
+def analyze_sentiment_series(reviews):
+    """
+    Perform basic sentiment analysis on a whole column of reviews.
+    
+    Polarity is computed in a single pass over the column (reusing the cached analyze_sentiment),
+    and the labels are then assigned for all reviews at once using bin_polarity().
+    
+    Parameters:
+        reviews (pd.Series): The review texts to analyze.
+    
+    Returns:
+        tuple: A tuple containing a NumPy array of sentiment labels and a NumPy array of polarity scores.
+    """
+    polarity = reviews.map(lambda text: analyze_sentiment(text)[1]).to_numpy(dtype=np.float64)
+    labels = SENTIMENT_LABELS[bin_polarity(polarity) + 1]
+    return labels, polarity
+
 def analyze_sentiment_advanced(text):
     """
     Perform advanced sentiment analysis using Hugging Face Transformers.
     
     This function uses a pre-trained Transformer model to analyze the sentiment of the input text.
     The output is a label (e.g., "POSITIVE" or "NEGATIVE") and a confidence score indicating how sure
-    the model is about its prediction.
+    the model is about its prediction. Results are cached by review text.
     
     Parameters:
         text (str): The review text to analyze.
@@ -64,19 +291,83 @@ def analyze_sentiment_advanced(text):
     Returns:
         tuple: A tuple containing the sentiment label and the confidence score.
     """
-    # Run the text through the advanced pipeline.
-    result = advanced_pipeline(text)
-    # The result is a list of dictionaries; we take the first element.
-    label = result[0]["label"]
-    score = result[0]["score"]
-    return label, score
+    return _advanced_single(text)
+
+@functools.lru_cache(maxsize=10000)
+def _advanced_single(text):
+    """
+    Analyze a single review and cache the (label, score) result.
+    
+    The review goes through analyze_sentiment_advanced_batch(), so it shares the disk cache
+    with full analyses.
+    """
+    result = analyze_sentiment_advanced_batch([text])[0]
+    return result["label"], result["score"]
+
+def analyze_sentiment_advanced_batch(texts, batch_size=32):
+    """
+    Perform advanced sentiment analysis on many reviews at once.
+    
+    Instead of calling the pipeline one review at a time, all texts are passed in a single call
+    so the Transformer can process them in padded batches. This is much faster on large review sets.
+    Duplicate reviews are only sent to the model once, and results are saved in a disk cache so
+    reviews analyzed in an earlier session are not sent to the model again. Large inputs are split
+    into chunks that are processed on several threads, so tokenization overlaps with inference.
+    
+    Parameters:
+        texts (iterable): The review texts to analyze.
+        batch_size (int): The number of reviews fed to the model per forward pass. Default is 32.
+    
+    Returns:
+        list: A list of dictionaries, each with a "label" and a "score" key, in the same order as the input.
+    """
+    texts = list(texts)
+    # Remove duplicates (keeping order) so each distinct review is analyzed once.
+    unique = list(dict.fromkeys(texts))
+    
+    # Look up each review in the disk cache and collect the ones that still need the model.
+    advanced_cache = get_advanced_cache()
+    by_text = {}
+    misses = []
+    for text in unique:
+        cached = advanced_cache.get(_advanced_cache_key(text))
+        if cached is None:
+            misses.append(text)
+        else:
+            label, score = cached
+            by_text[text] = {"label": label, "score": score}
+    
+    if misses:
+        chunks = [misses[i:i + ADVANCED_CHUNK_SIZE] for i in range(0, len(misses), ADVANCED_CHUNK_SIZE)]
+        if len(chunks) == 1:
+            miss_results = get_advanced_pipeline()(misses, batch_size=batch_size, truncation=True)
+        else:
+            # Load the models once before the worker threads share them.
+            get_advanced_pipeline()
+            _get_worker_model()
+            chunk_results = _get_advanced_executor().map(_run_advanced_chunk, chunks, [batch_size] * len(chunks))
+            miss_results = [result for results in chunk_results for result in results]
+        # Store all new results in a single transaction.
+        with advanced_cache.transact():
+            for text, result in zip(misses, miss_results):
+                advanced_cache[_advanced_cache_key(text)] = (result["label"], result["score"])
+                by_text[text] = result
+    return [by_text[text] for text in texts]
+
+def _advanced_cache_key(text):
+    """
+    Build the disk cache key for a review: the model name and the SHA-1 digest of the text.
+    """
+    return ADVANCED_MODEL, hashlib.sha1(text.encode("utf-8")).digest()
 
 def perform_topic_modeling(reviews, num_topics=3, num_words=5):
     """
     Perform topic modeling on a list of reviews using Non-negative Matrix Factorization (NMF).
     
-    This function vectorizes the input reviews using a bag-of-words approach (ignoring common English stop words),
-    applies NMF to extract the specified number of topics, and then returns a list of topics with their top words.
+    This function vectorizes the input reviews using TF-IDF weights over a vocabulary capped at 5000 words
+    (ignoring common English stop words), applies NMF to extract the specified number of topics, and then
+    returns a list of topics with their top words. Both the fitted model and the resulting topics are cached,
+    so calling this again with the same reviews, in any order, returns immediately.
     
     Parameters:
         reviews (list): A list of review texts.
@@ -86,24 +377,76 @@ def perform_topic_modeling(reviews, num_topics=3, num_words=5):
     Returns:
         list: A list of strings, each describing a topic with its most representative words.
     """
-    # Convert the list of reviews into a bag-of-words representation,
+    review_counts = Counter(reviews)
+    key = (frozenset(review_counts.items()), num_topics)
+    result_key = key + (num_words,)
+    if result_key in _topic_cache:
+        return _topic_cache[result_key]
+    if key not in _topic_model_cache:
+        _remember(_topic_model_cache, key, _fit_topic_model(reviews, review_counts, num_topics))
+    vectorizer, nmf, feature_names, _, _ = _topic_model_cache[key]
+    H = nmf.components_
+    num_words = max(min(num_words, len(feature_names)), 0)
+    
+    topics = []
+    # Loop through each topic and identify the top words.
+    for topic_idx, topic in enumerate(H):
+        # Pick the indices of the top words without sorting the whole vocabulary,
+        # then order just those from most to least representative.
+        if num_words == 0:
+            top_words = []
+        else:
+            idx = np.argpartition(topic, -num_words)[-num_words:]
+            idx = idx[np.argsort(topic[idx])[::-1]]
+            top_words = feature_names[idx]
+        topics.append(f"Topic {topic_idx+1}: " + ", ".join(top_words))
+    
+    _remember(_topic_cache, result_key, topics)
+    return topics
+
+def _remember(cache, key, value):
+    """
+    Store a value in one of the topic caches, dropping the oldest entries beyond TOPIC_CACHE_SIZE.
+    """
+    cache[key] = value
+    while len(cache) > TOPIC_CACHE_SIZE:
+        del cache[next(iter(cache))]
+
+def _fit_topic_model(reviews, review_counts, num_topics):
+    """
+    Fit the vectorizer and NMF model for perform_topic_modeling().
+    
+    If a model with the same number of topics was fitted on these reviews before a few more were
+    added, its vocabulary is reused and NMF starts from its topics instead of training from scratch.
+    A vocabulary is only reused while at most TOPIC_WARM_START_MAX_NEW reviews have been added
+    since it was fitted.
+    
+    Returns:
+        tuple: The vectorizer, the fitted NMF model, the feature names, the count of each review
+               text and the number of reviews the vocabulary was fitted on.
+    """
+    for (_, cached_topics), cached in _topic_model_cache.items():
+        vectorizer, nmf, feature_names, cached_counts, vocabulary_reviews = cached
+        # Only warm-start when the earlier reviews have grown by a few new ones.
+        if (cached_topics == num_topics
+                and len(reviews) - vocabulary_reviews <= TOPIC_WARM_START_MAX_NEW
+                and cached_counts < review_counts):
+            X = vectorizer.transform(reviews)
+            warm_nmf = NMF(n_components=num_topics, init='custom', solver='mu', max_iter=200, random_state=42)
+            warm_nmf.fit(X, W=nmf.transform(X), H=nmf.components_.copy())
+            return vectorizer, warm_nmf, feature_names, review_counts, vocabulary_reviews
+    
+    # Convert the list of reviews into TF-IDF weighted word counts,
     # ignoring common words that don't add much meaning.
-    vectorizer = CountVectorizer(stop_words='english')
+    vectorizer = TfidfVectorizer(stop_words='english', max_features=5000)
     X = vectorizer.fit_transform(reviews)
+    # The list of ignored words is only kept for inspection and can be large, so drop it.
+    vectorizer.stop_words_ = None
     
     # Apply NMF to the document-term matrix to extract topics.
-    nmf = NMF(n_components=num_topics, random_state=42)
+    nmf = NMF(n_components=num_topics, solver='mu', max_iter=200, random_state=42)
     nmf.fit(X)
-    H = nmf.components_
     
     # Get the words corresponding to each feature.
     feature_names = vectorizer.get_feature_names_out()
-    
-    topics = []
-    # Loop through each topic and identify the top words.
-    for topic_idx, topic in enumerate(H):
-        # Get indices of the top words for this topic.
-        top_words = [feature_names[i] for i in topic.argsort()[:-num_words - 1:-1]]
-        topics.append(f"Topic {topic_idx+1}: " + ", ".join(top_words))
-    
-    return topics
\ No newline at end of file
+    return vectorizer, nmf, feature_names, review_counts, len(reviews)
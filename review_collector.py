@@ -20,6 +20,8 @@ def submit_review():
     """
     Saves the current date, rating, and review to the CSV.
     """
+    global total_reviews
+    
     rating_value = rating_scale.get()
     review_text_value = review_text.get("1.0", tk.END).strip()
     
@@ -29,12 +31,13 @@ def submit_review():
     
     current_date = datetime.now().strftime("%Y-%m-%d")
     
-    with open(CSV_FILE, mode="a", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow([current_date, rating_value, review_text_value])
+    # Write through the append handle that stays open for the whole session,
+    # then flush so the review reaches the file right away.
+    csv_writer.writerow([current_date, rating_value, review_text_value])
+    csv_handle.flush()
     
-    # Optional: Show how many total reviews are in CSV
-    total_reviews = get_total_reviews()
+    # Keep the running count in memory instead of re-reading the CSV
+    total_reviews += 1
     
     messagebox.showinfo(
         "Thank You!",
@@ -52,11 +55,10 @@ def get_total_reviews():
     """
     Returns the total number of reviews in the CSV (excluding the header).
     """
-    with open(CSV_FILE, mode="r", encoding="utf-8") as f:
+    with open(CSV_FILE, mode="r", newline="", encoding="utf-8") as f:
         reader = csv.reader(f)
-        rows = list(reader)
-        # Subtract 1 for the header row
-        return len(rows) - 1
+        # Count rows without holding them all in memory, then subtract 1 for the header row
+        return sum(1 for _ in reader) - 1
 
 def on_rating_change(event):
     """
@@ -65,6 +67,13 @@ def on_rating_change(event):
     current_rating = rating_scale.get()
     rating_label_var.set(f"{current_rating}")
 
+def on_close():
+    """
+    Flushes and closes the CSV file before the window is destroyed.
+    """
+    csv_handle.close()
+    root.destroy()
+
 # ---------------------- MAIN UI SETUP ----------------------
 root = tk.Tk()
 root.title("Feedback Form - We Value Your Opinion!")
@@ -73,6 +82,12 @@ root.geometry("450x350")
 # Ensure CSV file is ready
 ensure_csv_exists()
 
+# Count existing reviews once, then keep a single append handle open for new ones
+total_reviews = get_total_reviews()
+csv_handle = open(CSV_FILE, mode="a", newline="", encoding="utf-8")
+csv_writer = csv.writer(csv_handle)
+root.protocol("WM_DELETE_WINDOW", on_close)
+
 # Title
 title_label = ttk.Label(root, text="We'd love your feedback!", font=("Helvetica", 16, "bold"))
 title_label.pack(pady=10)